@@ -1,47 +1,58 @@
 from __future__ import annotations
+import asyncio
 import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+import numpy as np
 import pandas as pd
-import requests
 
+from src.cache import cache
 from src.config import settings
-from src.data_sources import bitget_tickers, bitget_candles, build_symbol_marketcap_map, filter_small_caps
-from src.signals import compute_signal
-from src.telegram_bot import send_alert as tg_send_alert
+from src.data_sources import bitget_tickers, build_symbol_marketcap_map, filter_small_caps, ticker_symbols
+from src.data_sources_async import CandlePair, fetch_candles
+from src.indicators_fast import warmup
+from src.signals import compute_signals_batch
+from src.ws_bitget import stream_candle_pairs
+from src.telegram_bot import send_alerts as tg_send_alerts
 from src.config import settings as _settings
 
 REQUIRED_SCORE = 5
+# Alerts are batched into Telegram messages up to this many characters (hard limit 4096)
+ALERT_BATCH_CHARS = 3800
 
 
-def pick_symbols(tickers: List[Dict[str, Any]], cg_caps: Dict[str, float]) -> List[Dict[str, Any]]:
-    # Skip 24h gainers > threshold
-    filtered = []
-    for t in tickers:
-        change = None
-        for key in ("priceChgPct", "changePercent", "chgPct"):
-            if key in t:
-                try:
-                    # Bitget returns percent like "1.23%" or "0.0123"; normalize to 0-100 scale
-                    val = t[key]
-                    if isinstance(val, str) and val.endswith("%"):
-                        change = float(val.strip("%"))
-                    else:
-                        change = float(val) * (100 if abs(float(val)) < 2 else 1)
-                    break
-                except Exception:
-                    continue
-        t["_24h_change_pct"] = change
-        filtered.append(t)
-
-    small_caps = filter_small_caps(filtered, settings.min_market_cap, settings.max_market_cap, cg_caps)
-    result = []
-    for t in small_caps:
-        chg = t.get("_24h_change_pct")
-        if chg is not None and chg > settings.skip_if_24h_gain_pct:
+def _change_pct(df: pd.DataFrame) -> pd.Series:
+    """24h change in percent (0-100 scale) per ticker row; NaN where unavailable."""
+    change = pd.Series(np.nan, index=df.index)
+    for key in ("priceChgPct", "changePercent", "chgPct"):
+        if key not in df.columns:
             continue
-        result.append(t)
-    return result
+        # Bitget returns percent like "1.23%" or "0.0123"; normalize to 0-100 scale
+        raw = df[key].astype(str)
+        val = pd.to_numeric(raw.str.strip("%"), errors="coerce")
+        val = val.where(raw.str.endswith("%"), val * np.where(val.abs() < 2, 100, 1))
+        # First key that parses wins
+        change = change.fillna(val)
+    return change
+
+
+def pick_symbols(tickers: pd.DataFrame, cg_caps: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Filter the ticker frame by quote asset, 24h quote volume, market cap and 24h gain.
+    Only the surviving rows are turned back into dicts (missing values as None).
+    """
+    if tickers.empty:
+        return []
+    # Cheap pre-filters first, as one boolean mask over the ticker columns
+    mask = ticker_symbols(tickers).str.endswith(settings.quote_asset.upper())
+    if "quoteVol" in tickers.columns:
+        mask &= pd.to_numeric(tickers["quoteVol"], errors="coerce") > settings.min_quote_volume
+    small_caps = filter_small_caps(tickers[mask], settings.min_market_cap, settings.max_market_cap, cg_caps)
+    if small_caps.empty:
+        return []
+    # Skip 24h gainers > threshold
+    change = _change_pct(small_caps)
+    result = small_caps[~(change > settings.skip_if_24h_gain_pct)].assign(_24h_change_pct=change)
+    return result.astype(object).where(result.notna(), None).to_dict("records")
 
 
 def _header(source: str) -> str:
@@ -75,10 +86,29 @@ def format_alert(symbol: str, analysis: Dict[str, Any], social: Dict[str, Any] |
     return msg
 
 
+def scan_symbols(symbols: List[Dict[str, Any]], frames: Dict[str, CandlePair]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Score every ticker that has usable prefetched 1h/15m candles in one batch.
+    Returns {symbol: (base, analysis)} in ticker order.
+    """
+    scanned: List[Tuple[str, str]] = []
+    for t in symbols:
+        sym = t.get("symbol") or t.get("instId")
+        if not sym or sym not in frames:
+            continue
+        df_1h, df_15m = frames[sym]
+        if len(df_1h) < 60 or len(df_15m) < 60:
+            continue
+        scanned.append((sym, t.get("_base") or sym))
+    results = compute_signals_batch([frames[sym] for sym, _ in scanned])
+    return {sym: (base, analysis) for (sym, base), analysis in zip(scanned, results)}
+
+
 def run_once():
     try:
+        cache.reset_stats()
         print(f"[{datetime.utcnow().isoformat()}] Fetching tickers...")
-        tickers = bitget_tickers()
+        # One columnar frame for all tickers; filters below are column operations
+        tickers = pd.DataFrame(bitget_tickers())
         print(f"Tickers: {len(tickers)}")
 
         print("Fetching CoinGecko market caps (Bitget-matched)...")
@@ -88,70 +118,54 @@ def run_once():
         if len(cg_caps) < 50:
             print("Few caps from exchange mapping; augmenting with generic symbol mapping...")
             generic_caps = build_symbol_marketcap_map(pages=getattr(settings, 'coingecko_pages', 8))
-            cg_caps.update(generic_caps)
+            # Merge into a new dict; the map returned above is the cached object
+            cg_caps = {**cg_caps, **generic_caps}
         symbols = pick_symbols(tickers, cg_caps)
-        print(f"Candidates after market-cap filter: {len(symbols)}")
-
+        print(f"Candidates after filters: {len(symbols)}")
+        rate = cache.hit_rate()
+        if rate is not None:
+            print(f"Cache hit rate: {rate:.0%} ({cache.hits} hits, {cache.misses} misses)")
+
+        # Candles come from the websocket stream when it already holds them; the rest are
+        # fetched concurrently over REST on one event loop. Scoring is CPU-only and runs
+        # afterwards on the collected frames.
+        syms = [sym for sym in (t.get("symbol") or t.get("instId") for t in symbols) if sym]
+        frames: Dict[str, CandlePair] = stream_candle_pairs(syms) if settings.bitget_ws else {}
+        missing = [sym for sym in syms if sym not in frames]
+        if missing:
+            frames.update(asyncio.run(fetch_candles(missing, limit=300, concurrency=settings.scan_workers)))
+        print(f"Candles: {len(syms) - len(missing)} from websocket, {len(missing)} via REST")
+
+        analyses = scan_symbols(symbols, frames)
         alerts: List[str] = []
-        for t in symbols:
-            sym = t.get("symbol") or t.get("instId")
-            if not sym:
-                continue
-            # Try both plain and _SPBL suffix for candles if needed
-            symbol_variants = [sym]
-            if not sym.endswith("_SPBL"):
-                symbol_variants.append(f"{sym}_SPBL")
-
-            df_1h = None
-            df_15m = None
-            for sv in symbol_variants:
-                try:
-                    df_1h = bitget_candles(sv, interval="1h", limit=300)
-                    df_15m = bitget_candles(sv, interval="15m", limit=300)
-                    if len(df_1h) and len(df_15m):
-                        break
-                except requests.RequestException:
-                    continue
-            if df_1h is None or df_15m is None or len(df_1h) < 60 or len(df_15m) < 60:
-                continue
-
-            analysis = compute_signal(df_1h, df_15m)
+        bases: List[str] = []
+        for base, analysis in analyses.values():
             if analysis["score"] >= REQUIRED_SCORE:
-                base = t.get("_base") or sym
-                msg = format_alert(base, analysis, social=None, source="manual")
-                alerts.append(msg)
-                # Send to Telegram immediately
-                sent = tg_send_alert(msg, html=True)
-                if sent:
-                    print(f"Sent Telegram alert for {base} [manual]")
-
-        # Second pass: Gemini-driven check (placeholder using same analysis for now)
+                alerts.append(format_alert(base, analysis, social=None, source="manual"))
+                bases.append(base)
+        if alerts:
+            # Several alerts per Telegram message instead of one HTTPS call each
+            sent = tg_send_alerts(alerts, html=True, limit=ALERT_BATCH_CHARS)
+            print(f"Sent {len(sent)}/{len(alerts)} Telegram alerts [manual]: {', '.join(bases[i] for i in sent)}")
+
+        # Second pass: Gemini-driven check (placeholder using same analysis for now).
+        # Reuses the analyses from the first pass instead of fetching candles again.
         if _settings.gemini_api_key:
+            gemini_alerts: List[str] = []
+            gemini_bases: List[str] = []
             for t in symbols[:50]:  # limit to avoid spam; adjust as needed
-                sym = t.get("symbol") or t.get("instId")
-                if not sym:
-                    continue
-                symbol_variants = [sym]
-                if not sym.endswith("_SPBL"):
-                    symbol_variants.append(f"{sym}_SPBL")
-                df_1h = df_15m = None
-                for sv in symbol_variants:
-                    try:
-                        df_1h = bitget_candles(sv, interval="1h", limit=300)
-                        df_15m = bitget_candles(sv, interval="15m", limit=300)
-                        if len(df_1h) and len(df_15m):
-                            break
-                    except requests.RequestException:
-                        continue
-                if df_1h is None or df_15m is None or len(df_1h) < 60 or len(df_15m) < 60:
+                res = analyses.get(t.get("symbol") or t.get("instId"))
+                if res is None:
                     continue
+                base, analysis = res
                 # Here you would call Gemini to evaluate; for now reuse the same scoring
-                analysis = compute_signal(df_1h, df_15m)
                 if analysis["score"] >= REQUIRED_SCORE:
-                    base = t.get("_base") or sym
-                    msg = format_alert(base, analysis, social=None, source="gemini")
-                    tg_send_alert(msg, html=True)
-                    print(f"Sent Telegram alert for {base} [gemini]")
+                    gemini_alerts.append(format_alert(base, analysis, social=None, source="gemini"))
+                    gemini_bases.append(base)
+            if gemini_alerts:
+                sent = tg_send_alerts(gemini_alerts, html=True, limit=ALERT_BATCH_CHARS)
+                print(f"Sent {len(sent)}/{len(gemini_alerts)} Telegram alerts [gemini]: "
+                      f"{', '.join(gemini_bases[i] for i in sent)}")
 
         if alerts:
             print("\n===== ALERTS =====\n")
@@ -166,6 +180,7 @@ def run_once():
 
 
 if __name__ == "__main__":
+    warmup()
     # Simple loop; for true scheduling, we can add schedule later
     while True:
         run_once()
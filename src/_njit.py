@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+# numba is optional. Without it `njit` is a no-op decorator and the indicator
+# wrappers fall back to their vectorized NumPy/pandas implementations.
+try:
+    from numba import njit, prange  # type: ignore
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):  # type: ignore
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+# fastmath minus the no-NaN/no-inf flags: kernels emit NaN over warm-up windows
+# and test for it, which `fastmath=True` would be free to optimize away.
+FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
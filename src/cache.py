@@ -0,0 +1,94 @@
+from __future__ import annotations
+import functools
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from src.config import settings
+
+
+class Incomplete:
+    """Wraps a memoized function's result to mark it as partial (e.g. some pages
+    failed to fetch). The caller still gets the value, but it is not cached.
+    """
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class Cache:
+    """Small TTL cache, kept in memory and optionally mirrored as JSON files on disk
+    so entries survive restarts. Values must be JSON-serializable.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._mem: Dict[str, Tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._mem.get(key)
+        if entry is None:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                entry = (float(raw["expires_at"]), raw["value"])
+                self._mem[key] = entry
+            except (OSError, ValueError, KeyError, TypeError):
+                entry = None
+        if entry is None or entry[0] < time.time():
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, expire: float, persist: bool = True) -> None:
+        expires_at = time.time() + expire
+        self._mem[key] = (expires_at, value)
+        if not persist:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "expires_at": expires_at, "value": value}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Cache write failed for {key}: {e}")
+
+    def memoize(self, expire: float, persist: bool = True) -> Callable:
+        """Cache a function's result per (name, args) for `expire` seconds.
+        Empty and Incomplete results are not cached so a failed fetch is retried on
+        the next call.
+        """
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = json.dumps([fn.__module__, fn.__qualname__, list(args), sorted(kwargs.items())], default=str)
+                value = self.get(key)
+                if value is None:
+                    value = fn(*args, **kwargs)
+                    if isinstance(value, Incomplete):
+                        value = value.value
+                    elif value:
+                        self.set(key, value, expire, persist=persist)
+                return value
+            return wrapper
+        return decorator
+
+    def hit_rate(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+cache = Cache(settings.cache_dir)
@@ -24,7 +24,15 @@ class Settings:
     min_market_cap: float = float(os.getenv("MIN_MARKET_CAP", 5_000_000))
     max_market_cap: float = float(os.getenv("MAX_MARKET_CAP", 250_000_000))
     skip_if_24h_gain_pct: float = float(os.getenv("SKIP_IF_24H_GAIN_PCT", 30))
+    quote_asset: str = os.getenv("QUOTE_ASSET", "USDT")
+    min_quote_volume: float = float(os.getenv("MIN_QUOTE_VOLUME", 100_000))
     coingecko_pages: int = int(os.getenv("COINGECKO_PAGES", 8))
     coingecko_exchange_pages: int = int(os.getenv("COINGECKO_EXCHANGE_PAGES", 5))
 
+    # Runtime
+    scan_workers: int = int(os.getenv("SCAN_WORKERS", 16))
+    cache_dir: str = os.getenv("CACHE_DIR", ".cache")
+    # Stream candles over the Bitget websocket; symbols it can't serve yet fall back to REST
+    bitget_ws: bool = os.getenv("BITGET_WS", "1") == "1"
+
 settings = Settings()
@@ -1,23 +1,59 @@
 from __future__ import annotations
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
 import requests
 import pandas as pd
+from .cache import Incomplete, cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BITGET_BASE = "https://api.bitget.com"
 COINGECKO_BASE = "https://api.coingecko.com/api/v3"
 
 STABLE_TARGETS = {"USDT", "USDC", "USD"}
 
+CANDLES_URL = f"{BITGET_BASE}/api/spot/v1/market/candles"
+CANDLE_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+# Bitget granularity is in seconds; map common intervals to it
+_INTERVAL_MAP = MappingProxyType({
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+})
+
+# Market caps move slowly, so the CoinGecko maps are cached on disk across runs.
+# Tickers are cached briefly in memory so quick retries don't refetch them.
+MARKETCAP_CACHE_TTL = 12 * 3600
+TICKERS_CACHE_TTL = 30
+
+# Shared session for every Bitget/CoinGecko call: keep-alive connections are reused
+# instead of opening a new TCP+TLS connection per request, and transient errors
+# (including 429 rate limiting) are retried with backoff.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=64,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 # ---- Bitget ----
 
+@cache.memoize(expire=TICKERS_CACHE_TTL, persist=False)
 def bitget_tickers() -> List[Dict[str, Any]]:
     """Fetch all 24h spot tickers from Bitget.
 
     Returns a list of dicts as provided by Bitget.
     """
     url = f"{BITGET_BASE}/api/spot/v1/market/tickers"
-    r = requests.get(url, timeout=20)
+    r = SESSION.get(url, timeout=20)
     r.raise_for_status()
     data = r.json()
     if data.get("code") not in ("00000", 0, "0"):
@@ -25,39 +61,18 @@ def bitget_tickers() -> List[Dict[str, Any]]:
     return data.get("data", [])
 
 
-def bitget_candles(symbol: str, interval: str = "1h", limit: int = 500) -> pd.DataFrame:
-    """Fetch candles for a symbol and interval. Returns DataFrame with columns:
-    timestamp, open, high, low, close, volume.
-
-    Bitget granularity supported values are seconds.
-    We map common intervals to seconds here.
-    """
-    interval_map = {
-        "1m": 60,
-        "5m": 300,
-        "15m": 900,
-        "30m": 1800,
-        "1h": 3600,
-        "4h": 14400,
-        "1d": 86400,
-    }
-    gran = interval_map.get(interval)
+def candle_granularity(interval: str) -> int:
+    """Map an interval like "1h" to Bitget's granularity in seconds."""
+    gran = _INTERVAL_MAP.get(interval)
     if gran is None:
         raise ValueError(f"Unsupported interval: {interval}")
+    return gran
 
-    url = f"{BITGET_BASE}/api/spot/v1/market/candles"
-    params = {
-        "symbol": symbol,
-        "granularity": gran,
-        # Bitget returns most recent first; we'll reverse later
-        # Some APIs support 'limit'; Bitget may use 'limit' or not. We'll request more via time window if needed.
-    }
-    r = requests.get(url, params=params, timeout=20)
-    r.raise_for_status()
-    data = r.json()
-    if data.get("code") not in ("00000", 0, "0"):
-        raise RuntimeError(f"Bitget error: {data}")
-    rows = data.get("data", [])
+
+def candles_frame(rows: List[List[Any]], limit: int = 500) -> pd.DataFrame:
+    """Turn raw Bitget candle rows (most recent first) into an ascending DataFrame with
+    columns timestamp, open, high, low, close, volume.
+    """
     # Expected row format: [timestamp(ms), open, high, low, close, volume]
     # Reverse to ascending time
     rows = list(reversed(rows))
@@ -65,17 +80,95 @@ def bitget_candles(symbol: str, interval: str = "1h", limit: int = 500) -> pd.Da
     if limit and len(rows) > limit:
         rows = rows[-limit:]
 
-    df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
-    # Convert types
-    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-    for col in ["open", "high", "low", "close", "volume"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df = df.dropna().reset_index(drop=True)
+    if not rows:
+        return pd.DataFrame(columns=list(CANDLE_COLUMNS))
+    arr = np.array([row[:6] for row in rows], dtype=object)
+    try:
+        # Bitget sends well-formed numeric strings: convert the whole block at once
+        ts = arr[:, 0].astype(np.int64)
+        nums = arr[:, 1:].astype(np.float64)
+    except (TypeError, ValueError):
+        # Malformed values: coerce column by column and drop the bad rows
+        df = pd.DataFrame(arr, columns=list(CANDLE_COLUMNS))
+        for col in CANDLE_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df = df.dropna().reset_index(drop=True)
+        df["timestamp"] = pd.to_datetime(df["timestamp"].astype(np.int64), unit="ms")
+        return df
+    ok = ~np.isnan(nums).any(axis=1)
+    if not ok.all():
+        ts, nums = ts[ok], nums[ok]
+    df = pd.DataFrame(nums, columns=list(CANDLE_COLUMNS[1:]))
+    df.insert(0, "timestamp", pd.to_datetime(ts, unit="ms"))
     return df
 
 
+def bitget_candles(symbol: str, interval: str = "1h", limit: int = 500) -> pd.DataFrame:
+    """Fetch candles for a symbol and interval. Returns DataFrame with columns:
+    timestamp, open, high, low, close, volume.
+
+    Bitget granularity supported values are seconds; see _INTERVAL_MAP for the
+    supported intervals.
+    """
+    gran = candle_granularity(interval)
+    # Bitget returns most recent first; candles_frame reverses it.
+    # Some APIs support 'limit'; Bitget may use 'limit' or not. We'll request more via time window if needed.
+    params = {"symbol": symbol, "granularity": gran}
+    r = SESSION.get(CANDLES_URL, params=params, timeout=20)
+    r.raise_for_status()
+    data = r.json()
+    if data.get("code") not in ("00000", 0, "0"):
+        raise RuntimeError(f"Bitget error: {data}")
+    return candles_frame(data.get("data", []), limit)
+
+
 # ---- CoinGecko ----
 
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` calls per `period` seconds,
+    with bursts of up to `burst` calls.
+    """
+
+    def __init__(self, rate: float, period: float = 60.0, burst: int = 1):
+        self._interval = period / rate
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) / self._interval)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self._interval
+            time.sleep(wait)
+
+
+# Free tier allows roughly 30 requests/minute; every CoinGecko helper goes through this.
+COINGECKO_LIMITER = RateLimiter(rate=30, period=60.0, burst=8)
+COINGECKO_WORKERS = 4
+
+
+def _fetch_concurrently(fn: Callable[[Any], Any], args: List[Any]) -> List[Optional[Any]]:
+    """Call fn for each arg on a small thread pool, preserving order.
+    Calls that fail with a request error yield None.
+    """
+    def call(arg: Any) -> Optional[Any]:
+        try:
+            return fn(arg)
+        except requests.RequestException:
+            return None
+
+    with ThreadPoolExecutor(max_workers=COINGECKO_WORKERS) as ex:
+        return list(ex.map(call, args))
+
+
 def coingecko_markets(page: int = 1, per_page: int = 250) -> List[Dict[str, Any]]:
     """Fetch coins markets with market cap for mapping symbols to market caps.
     Note: symbol collisions exist across chains. We'll best-effort map by symbol.
@@ -89,7 +182,8 @@ def coingecko_markets(page: int = 1, per_page: int = 250) -> List[Dict[str, Any]
         "sparkline": "false",
         "price_change_percentage": "24h",
     }
-    r = requests.get(url, params=params, timeout=30)
+    COINGECKO_LIMITER.acquire()
+    r = SESSION.get(url, params=params, timeout=30)
     r.raise_for_status()
     return r.json()
 
@@ -108,7 +202,8 @@ def coingecko_markets_by_ids(ids: List[str]) -> List[Dict[str, Any]]:
         "sparkline": "false",
         "price_change_percentage": "24h",
     }
-    r = requests.get(url, params=params, timeout=30)
+    COINGECKO_LIMITER.acquire()
+    r = SESSION.get(url, params=params, timeout=30)
     r.raise_for_status()
     return r.json()
 
@@ -119,11 +214,13 @@ def coingecko_exchange_tickers(exchange_id: str = "bitget", page: int = 1) -> Di
     """
     url = f"{COINGECKO_BASE}/exchanges/{exchange_id}/tickers"
     params = {"page": page}
-    r = requests.get(url, params=params, timeout=30)
+    COINGECKO_LIMITER.acquire()
+    r = SESSION.get(url, params=params, timeout=30)
     r.raise_for_status()
     return r.json()
 
 
+@cache.memoize(expire=MARKETCAP_CACHE_TTL)
 def build_marketcap_map_from_exchange(pages: int = 5) -> Dict[str, float]:
     """Build base-symbol -> market_cap map using CoinGecko Bitget exchange tickers.
     Strategy:
@@ -133,15 +230,10 @@ def build_marketcap_map_from_exchange(pages: int = 5) -> Dict[str, float]:
     - Map symbol.upper() -> market_cap (choose max cap across duplicates)
     """
     coin_ids: List[str] = []
-    for p in range(1, pages + 1):
-        try:
-            payload = coingecko_exchange_tickers(page=p)
-        except requests.RequestException:
-            break
-        tickers = payload.get("tickers", []) or []
-        if not tickers:
-            # No more pages
-            break
+    payloads = _fetch_concurrently(lambda p: coingecko_exchange_tickers(page=p), list(range(1, pages + 1)))
+    complete = None not in payloads
+    for payload in payloads:
+        tickers = (payload or {}).get("tickers", []) or []
         for t in tickers:
             target = str(t.get("target", "")).upper()
             if target not in STABLE_TARGETS:
@@ -149,7 +241,6 @@ def build_marketcap_map_from_exchange(pages: int = 5) -> Dict[str, float]:
             cid = t.get("coin_id") or (t.get("coin", {}) or {}).get("id")
             if cid:
                 coin_ids.append(cid)
-        time.sleep(0.5)
     # Deduplicate
     coin_ids = list(dict.fromkeys(coin_ids))
     if not coin_ids:
@@ -157,75 +248,79 @@ def build_marketcap_map_from_exchange(pages: int = 5) -> Dict[str, float]:
     # Chunk and fetch markets
     caps: Dict[str, float] = {}
     chunk = 200
-    for i in range(0, len(coin_ids), chunk):
-        part = coin_ids[i:i+chunk]
-        try:
-            markets = coingecko_markets_by_ids(part)
-        except requests.RequestException:
-            continue
-        for m in markets:
+    parts = [coin_ids[i:i+chunk] for i in range(0, len(coin_ids), chunk)]
+    markets_parts = _fetch_concurrently(coingecko_markets_by_ids, parts)
+    complete = complete and None not in markets_parts
+    for markets in markets_parts:
+        for m in markets or []:
             sym = str(m.get("symbol", "")).upper()
             mc = m.get("market_cap")
             if mc is None or not sym:
                 continue
             caps[sym] = max(float(mc), caps.get(sym, 0.0))
-        time.sleep(0.5)
-    return caps
+    # Don't cache a map with missing pages/chunks for the full TTL
+    return caps if complete else Incomplete(caps)
 
 
+@cache.memoize(expire=MARKETCAP_CACHE_TTL)
 def build_symbol_marketcap_map(pages: int = 4) -> Dict[str, float]:
     """Build a mapping from ticker symbol (e.g., 'abc') to market cap in USD.
     This is best-effort and may skip ambiguous symbols with conflicting caps.
     """
     caps: Dict[str, List[float]] = {}
-    for p in range(1, pages + 1):
-        try:
-            items = coingecko_markets(page=p)
-        except requests.RequestException:
-            break
-        for it in items:
+    pages_items = _fetch_concurrently(lambda p: coingecko_markets(page=p), list(range(1, pages + 1)))
+    for items in pages_items:
+        for it in items or []:
             sym = str(it.get("symbol", "")).upper()
             mc = it.get("market_cap")
             if mc is None:
                 continue
             caps.setdefault(sym, []).append(float(mc))
-        # be gentle
-        time.sleep(1)
     result: Dict[str, float] = {}
     for sym, lst in caps.items():
         # If multiple entries, take median to reduce outliers
         s = sorted(lst)
         mid = s[len(s)//2]
         result[sym] = mid
-    return result
+    return result if None not in pages_items else Incomplete(result)
+
+
+def ticker_symbols(df: pd.DataFrame) -> pd.Series:
+    """Normalized pair names for a frame of Bitget tickers: symbol (or instId) with
+    "-" and the _SPBL suffix removed, e.g. ABC-USDT / ABCUSDT_SPBL -> ABCUSDT.
+    Rows without a symbol yield "".
+    """
+    sym = df["symbol"] if "symbol" in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+    if "instId" in df.columns:
+        sym = sym.where(sym.notna() & (sym != ""), df["instId"])
+    return sym.fillna("").astype(str).str.replace("-", "", regex=False).str.replace("_SPBL", "", regex=False)
+
+
+def ticker_base_assets(df: pd.DataFrame) -> pd.Series:
+    """Vectorized base-asset extraction for a frame of Bitget tickers
+    (e.g. ABCUSDT / ABC-USDT / ABCUSDT_SPBL -> ABC). Rows without a symbol yield "".
+    """
+    s = ticker_symbols(df)
+    base = np.select(
+        [s.str.endswith("USDT"), s.str.endswith("USDC"), s.str.endswith("USD")],
+        [s.str[:-4], s.str[:-4], s.str[:-3]],
+        # fallback: take first 3-5 letters
+        default=s.str[:5],
+    )
+    return pd.Series(base, index=df.index, dtype=object).str.upper()
 
 
-def filter_small_caps(bitget_tickers: List[Dict[str, Any]], min_cap: float, max_cap: float,
-                      cg_symbol_caps: Dict[str, float]) -> List[Dict[str, Any]]:
+def filter_small_caps(bitget_tickers: pd.DataFrame, min_cap: float, max_cap: float,
+                      cg_symbol_caps: Dict[str, float]) -> pd.DataFrame:
     """Filter Bitget tickers by CoinGecko symbol-based market cap range.
     We extract base asset from symbol (e.g., ABCUSDT -> ABC) and look up in CoinGecko caps.
+    Takes the tickers as a DataFrame (one row per ticker; a list of dicts is converted)
+    and returns the surviving rows with _base and _market_cap columns added.
     """
-    filtered: List[Dict[str, Any]] = []
-    for t in bitget_tickers:
-        symbol = t.get("symbol") or t.get("instId") or ""
-        base = None
-        if symbol:
-            # Common spot symbols look like ABCUSDT or ABC-USDT or ABCUSDT_SPBL
-            s = symbol.replace("-", "").replace("_SPBL", "")
-            if s.endswith("USDT"):
-                base = s[:-4]
-            elif s.endswith("USDC"):
-                base = s[:-4]
-            elif s.endswith("USD"):
-                base = s[:-3]
-            else:
-                # fallback: take first 3-5 letters
-                base = s[:5]
-        if not base:
-            continue
-        cap = cg_symbol_caps.get(base.upper())
-        if cap is None:
-            continue
-        if min_cap <= cap <= max_cap:
-            filtered.append({**t, "_base": base.upper(), "_market_cap": cap})
-    return filtered
+    df = bitget_tickers if isinstance(bitget_tickers, pd.DataFrame) else pd.DataFrame(bitget_tickers)
+    if df.empty:
+        return df
+    base = ticker_base_assets(df)
+    cap = base.map(cg_symbol_caps)
+    mask = (base != "") & cap.between(min_cap, max_cap)
+    return df[mask].assign(_base=base[mask], _market_cap=cap[mask].astype(np.float64))
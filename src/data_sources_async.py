@@ -0,0 +1,91 @@
+from __future__ import annotations
+import asyncio
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+import pandas as pd
+
+from .cache import cache
+from .data_sources import CANDLES_URL, candle_granularity, candles_frame
+
+# Candle fetching for the scan runs on one event loop: every (symbol, interval)
+# request shares a single connection pool and a semaphore bounds how many are in flight.
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRIES = 3
+BACKOFF = 0.3
+
+CandlePair = Tuple[pd.DataFrame, pd.DataFrame]
+
+# Symbol variant (plain or _SPBL) that last returned candles, per ticker symbol.
+# Mirrored to the disk cache so a restart still tries the right variant first.
+_SYM_VARIANT_CACHE: Dict[str, str] = {}
+VARIANT_CACHE_KEY = "bitget_symbol_variants"
+VARIANT_CACHE_TTL = 7 * 24 * 3600
+
+
+async def bitget_candles_async(session: aiohttp.ClientSession, symbol: str, interval: str = "1h",
+                               limit: int = 500) -> pd.DataFrame:
+    """Async counterpart of data_sources.bitget_candles; same return shape.
+    Transient HTTP errors are retried with exponential backoff.
+    """
+    params = {"symbol": symbol, "granularity": candle_granularity(interval)}
+    for attempt in range(RETRIES + 1):
+        async with session.get(CANDLES_URL, params=params, timeout=aiohttp.ClientTimeout(total=20)) as r:
+            if r.status in RETRY_STATUSES and attempt < RETRIES:
+                await asyncio.sleep(BACKOFF * 2 ** attempt)
+                continue
+            r.raise_for_status()
+            data = await r.json(content_type=None)
+            break
+    if not isinstance(data, dict) or data.get("code") not in ("00000", 0, "0"):
+        raise RuntimeError(f"Bitget error: {data}")
+    return candles_frame(data.get("data", []), limit)
+
+
+async def fetch_candle_pair(session: aiohttp.ClientSession, sem: asyncio.Semaphore, sym: str,
+                            limit: int = 300) -> Optional[CandlePair]:
+    """Fetch 1h and 15m candles for sym, falling back to the _SPBL symbol variant.
+    Returns None when no variant could be fetched.
+    """
+    symbol_variants = [sym]
+    if not sym.endswith("_SPBL"):
+        symbol_variants.append(f"{sym}_SPBL")
+    known = _SYM_VARIANT_CACHE.get(sym)
+    if known in symbol_variants:
+        symbol_variants.remove(known)
+        symbol_variants.insert(0, known)
+
+    pair: Optional[CandlePair] = None
+    for sv in symbol_variants:
+        try:
+            async with sem:
+                df_1h, df_15m = await asyncio.gather(
+                    bitget_candles_async(session, sv, interval="1h", limit=limit),
+                    bitget_candles_async(session, sv, interval="15m", limit=limit),
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, RuntimeError):
+            # Network errors, non-JSON bodies and Bitget error codes only fail this variant
+            continue
+        pair = (df_1h, df_15m)
+        if len(df_1h) and len(df_15m):
+            _SYM_VARIANT_CACHE[sym] = sv
+            break
+    return pair
+
+
+async def fetch_candles(symbols: List[str], limit: int = 300, concurrency: int = 32) -> Dict[str, CandlePair]:
+    """Fetch 1h/15m candles for all symbols concurrently. Returns {symbol: (df_1h, df_15m)}
+    for the symbols that could be fetched.
+    """
+    if not _SYM_VARIANT_CACHE:
+        _SYM_VARIANT_CACHE.update(cache.get(VARIANT_CACHE_KEY) or {})
+    sem = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=64)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            pairs = await asyncio.gather(*[fetch_candle_pair(session, sem, s, limit) for s in symbols])
+    finally:
+        # Keep the variants learned so far even if the fetch failed part way
+        if _SYM_VARIANT_CACHE:
+            cache.set(VARIANT_CACHE_KEY, dict(_SYM_VARIANT_CACHE), VARIANT_CACHE_TTL)
+    return {s: p for s, p in zip(symbols, pairs) if p is not None}
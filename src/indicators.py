@@ -1,7 +1,7 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-import ta
+from .indicators_fast import _ema, _macd, _mfi, _rsi
 
 
 def ensure_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
@@ -9,36 +9,50 @@ def ensure_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
     missing = [c for c in needed if c not in df.columns]
     if missing:
         raise ValueError(f"Missing columns: {missing}")
-    return df.copy()
+    # No copy: add_indicators attaches its columns with df.assign, which returns a new frame
+    return df
 
 
-def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def add_core_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """RSI and EMA20/50: the cheap columns the signal gate needs."""
     df = ensure_ohlcv(df)
-    # RSI
-    df["rsi"] = ta.momentum.RSIIndicator(close=df["close"], window=14).rsi()
-    # MFI
-    df["mfi"] = ta.volume.MFIIndicator(high=df["high"], low=df["low"], close=df["close"], volume=df["volume"], window=14).money_flow_index()
-    # MACD
-    macd = ta.trend.MACD(close=df["close"])
-    df["macd"] = macd.macd()
-    df["macd_signal"] = macd.macd_signal()
-    # EMAs
-    df["ema20"] = ta.trend.EMAIndicator(close=df["close"], window=20).ema_indicator()
-    df["ema50"] = ta.trend.EMAIndicator(close=df["close"], window=50).ema_indicator()
-    df["ema200"] = ta.trend.EMAIndicator(close=df["close"], window=200).ema_indicator()
-    # Volume MA for spike detection
-    df["vol_ma20"] = df["volume"].rolling(20).mean()
-    return df
+    close = df["close"].to_numpy(dtype=np.float64)
+    return df.assign(**{
+        "rsi": _rsi(close, 14),
+        "ema20": _ema(close, 20),
+        "ema50": _ema(close, 50),
+    })
+
+
+def add_extended_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """MFI, MACD (line and signal) and EMA200."""
+    df = ensure_ohlcv(df)
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    close = df["close"].to_numpy(dtype=np.float64)
+    volume = df["volume"].to_numpy(dtype=np.float64)
+    macd, macd_signal = _macd(close)
+    return df.assign(**{
+        "mfi": _mfi(high, low, close, volume, 14),
+        "macd": macd,
+        "macd_signal": macd_signal,
+        "ema200": _ema(close, 200),
+    })
+
+
+def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    return add_extended_indicators(add_core_indicators(df))
 
 
-def recent_resistance_break(df: pd.DataFrame, lookback: int = 20) -> bool:
-    if len(df) < lookback + 1:
+def recent_resistance_break(high: np.ndarray, close: np.ndarray, lookback: int = 20) -> bool:
+    if len(high) < lookback + 1:
         return False
-    recent_high = df["high"].iloc[-(lookback+1):-1].max()
-    return bool(df["close"].iloc[-1] > recent_high)
+    recent_high = high[-(lookback+1):-1].max()
+    return bool(close[-1] > recent_high)
 
 
-def volume_spike(df: pd.DataFrame, multiple: float = 2.0) -> bool:
-    if df["vol_ma20"].isna().iloc[-1]:
+def volume_spike(volume: np.ndarray, multiple: float = 2.0, window: int = 20) -> bool:
+    # Only the latest window's mean is needed, not a full rolling pass
+    if len(volume) < window:
         return False
-    return bool(df["volume"].iloc[-1] > multiple * df["vol_ma20"].iloc[-1])
+    return bool(volume[-1] > multiple * volume[-window:].mean())
@@ -0,0 +1,260 @@
+from __future__ import annotations
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+from ._njit import FASTMATH, NUMBA_AVAILABLE, njit, prange
+
+# Indicator kernels used by add_indicators.
+# Inputs are float64 arrays; outputs have the same length and are NaN over the
+# warm-up window, matching the defaults of the `ta` indicators they replace.
+# The recurrences run as numba loops when numba is installed; otherwise the
+# vectorized NumPy/pandas versions below are used. Kernels carry explicit float64
+# signatures, so numba compiles them at import (or loads them from the on-disk
+# cache) instead of on the first real call.
+
+if NUMBA_AVAILABLE:
+    from numba import types as nt
+    # Inputs are typed read-only so the read-only views pandas hands out under
+    # copy-on-write are accepted; writable arrays convert to these as well.
+    _in1 = nt.Array(nt.float64, 1, "A", readonly=True)
+    _in2 = nt.Array(nt.float64, 2, "A", readonly=True)
+    _idx = nt.Array(nt.int64, 1, "A", readonly=True)
+    _SIG_EWM = nt.void(_in1, nt.float64, nt.int64, nt.float64[:])
+    _SIG_RSI = nt.void(_in1, nt.int64, nt.float64[:])
+    _SIG_MFI = nt.void(_in1, _in1, _in1, _in1, nt.int64, nt.float64[:])
+    _SIG_BATCH = nt.void(_in2, _idx, _in2, _in2, _in2, _idx, nt.float64[:, :], nt.boolean[:, :])
+else:
+    _SIG_EWM = _SIG_RSI = _SIG_MFI = _SIG_BATCH = None
+
+
+@njit(_SIG_EWM, cache=True, fastmath=FASTMATH)
+def _ewm_nb(x, alpha, min_periods, out):
+    # adjust=False EWM; leading NaNs are skipped like pandas does
+    weighted = 0.0
+    nobs = 0
+    for i in range(len(x)):
+        if not np.isnan(x[i]):
+            weighted = x[i] if nobs == 0 else alpha * x[i] + (1.0 - alpha) * weighted
+            nobs += 1
+        out[i] = weighted if nobs >= min_periods else np.nan
+
+
+@njit(_SIG_RSI, cache=True, fastmath=FASTMATH)
+def _rsi_nb(close, n, out):
+    alpha = 1.0 / n
+    up = 0.0
+    dn = 0.0
+    for i in range(len(close)):
+        d = close[i] - close[i - 1] if i > 0 else 0.0
+        gain = d if d > 0 else 0.0
+        loss = -d if d < 0 else 0.0
+        up = gain if i == 0 else alpha * gain + (1.0 - alpha) * up
+        dn = loss if i == 0 else alpha * loss + (1.0 - alpha) * dn
+        if i + 1 < n:
+            out[i] = np.nan
+        elif dn == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + up / dn)
+
+
+@njit(_SIG_MFI, cache=True, fastmath=FASTMATH)
+def _mfi_nb(high, low, close, volume, n, out):
+    m = len(close)
+    pos = np.zeros(m)
+    neg = np.zeros(m)
+    tp_prev = (high[0] + low[0] + close[0]) / 3.0
+    for i in range(1, m):
+        tp = (high[i] + low[i] + close[i]) / 3.0
+        if tp > tp_prev:
+            pos[i] = tp * volume[i]
+        elif tp < tp_prev:
+            neg[i] = tp * volume[i]
+        tp_prev = tp
+    for i in range(m):
+        if i + 1 < n:
+            out[i] = np.nan
+            continue
+        p = 0.0
+        q = 0.0
+        for j in range(i - n + 1, i + 1):
+            p += pos[j]
+            q += neg[j]
+        if q == 0:
+            out[i] = np.nan if p == 0 else 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + p / q)
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    return pd.Series(x).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+
+def _rolling_sum(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        out[n - 1:] = np.lib.stride_tricks.sliding_window_view(x, n).sum(axis=1)
+    return out
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    if NUMBA_AVAILABLE:
+        out = np.empty(len(x))
+        _ewm_nb(x, 2.0 / (span + 1.0), span, out)
+        return out
+    return pd.Series(x).ewm(span=span, min_periods=span, adjust=False).mean().to_numpy()
+
+
+def _rsi(close: np.ndarray, n: int = 14) -> np.ndarray:
+    """Wilder RSI."""
+    if NUMBA_AVAILABLE:
+        out = np.empty(len(close))
+        _rsi_nb(close, n, out)
+        return out
+    delta = np.diff(close, prepend=close[0])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _ewm(gain, 1.0 / n, n)
+    avg_loss = _ewm(loss, 1.0 / n, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+
+def _macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD line and its signal line."""
+    macd = np.empty(len(close))
+    np.subtract(_ema(close, fast), _ema(close, slow), out=macd)
+    return macd, _ema(macd, signal)
+
+
+def _mfi(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, n: int = 14) -> np.ndarray:
+    """Money Flow Index."""
+    if NUMBA_AVAILABLE:
+        out = np.empty(len(close))
+        _mfi_nb(high, low, close, volume, n, out)
+        return out
+    tp = (high + low + close) / 3.0
+    prev = np.empty_like(tp)
+    prev[0] = np.nan
+    prev[1:] = tp[:-1]
+    rmf = tp * volume
+    pos = _rolling_sum(np.where(tp > prev, rmf, 0.0), n)
+    neg = _rolling_sum(np.where(tp < prev, rmf, 0.0), n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100.0 - 100.0 / (1.0 + pos / neg)
+
+
+# ---- Batched scoring ----
+
+# Signal gate: symbols trading this far below EMA50, or with RSI this low, are not
+# setting up a bullish signal; they score 0 without the remaining indicators and patterns.
+GATE_EMA50_RATIO = 0.98
+GATE_MIN_RSI = 40.0
+
+
+def passes_gate(price: float, ema50: float, rsi: float) -> bool:
+    return not (price < ema50 * GATE_EMA50_RATIO or rsi < GATE_MIN_RSI)
+
+
+# Column layout of the arrays returned by batch_score
+BATCH_INDICATORS = ("rsi", "macd", "macd_signal", "ema20", "ema50", "ema200", "price")
+BATCH_CONDITIONS = (
+    "rsi_cross_50",
+    "macd_bullish_cross",
+    "price_above_ema20_50",
+    "ema20_gt_ema50",
+    "vol_spike_15m",
+    "rsi_15m_gt_50",
+    "break_resistance_15m",
+)
+
+
+@njit(_SIG_BATCH, parallel=True, cache=True, fastmath=FASTMATH)
+def _batch_score_nb(close_1h, start_1h, close_15m, high_15m, vol_15m, start_15m, ind, conds):
+    # Rows are right-aligned; row i's data starts at start_*[i]
+    for i in prange(close_1h.shape[0]):
+        c = close_1h[i, start_1h[i]:]
+        m = len(c)
+        rsi = np.empty(m)
+        _rsi_nb(c, 14, rsi)
+        ema20 = np.empty(m)
+        _ewm_nb(c, 2.0 / 21.0, 20, ema20)
+        ema50 = np.empty(m)
+        _ewm_nb(c, 2.0 / 51.0, 50, ema50)
+        price = c[m - 1]
+        ind[i, 0] = rsi[m - 1]
+        ind[i, 3] = ema20[m - 1]
+        ind[i, 4] = ema50[m - 1]
+        ind[i, 6] = price
+        if price < ema50[m - 1] * GATE_EMA50_RATIO or rsi[m - 1] < GATE_MIN_RSI:
+            # Gated out: conditions stay False and MACD/EMA200 are left NaN
+            ind[i, 1] = np.nan
+            ind[i, 2] = np.nan
+            ind[i, 5] = np.nan
+            continue
+        ema12 = np.empty(m)
+        _ewm_nb(c, 2.0 / 13.0, 12, ema12)
+        ema26 = np.empty(m)
+        _ewm_nb(c, 2.0 / 27.0, 26, ema26)
+        macd = ema12
+        macd -= ema26
+        signal = np.empty(m)
+        _ewm_nb(macd, 2.0 / 10.0, 9, signal)
+        ema200 = np.empty(m)
+        _ewm_nb(c, 2.0 / 201.0, 200, ema200)
+        ind[i, 1] = macd[m - 1]
+        ind[i, 2] = signal[m - 1]
+        ind[i, 5] = ema200[m - 1]
+        conds[i, 0] = rsi[m - 2] <= 50 and 50 < rsi[m - 1] < 80
+        conds[i, 1] = macd[m - 2] - signal[m - 2] <= 0 and macd[m - 1] - signal[m - 1] > 0
+        conds[i, 2] = price > ema20[m - 1] and price > ema50[m - 1]
+        conds[i, 3] = ema20[m - 1] > ema50[m - 1]
+
+        c15 = close_15m[i, start_15m[i]:]
+        h15 = high_15m[i, start_15m[i]:]
+        v15 = vol_15m[i, start_15m[i]:]
+        n = len(c15)
+        rsi15 = np.empty(n)
+        _rsi_nb(c15, 14, rsi15)
+        conds[i, 4] = n >= 20 and v15[n - 1] > 2.0 * v15[n - 20:].mean()
+        conds[i, 5] = rsi15[n - 1] > 50
+        conds[i, 6] = n >= 21 and c15[n - 1] > h15[n - 21:n - 1].max()
+
+
+def _stack(rows: List[np.ndarray], width: int) -> np.ndarray:
+    out = np.zeros((len(rows), width))
+    for i, r in enumerate(rows):
+        out[i, width - len(r):] = r
+    return out
+
+
+def batch_score(close_1h: List[np.ndarray], close_15m: List[np.ndarray], high_15m: List[np.ndarray],
+                vol_15m: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Score many symbols in one parallel numba pass. Each list holds one array per
+    symbol (at least 2 bars each); lengths may differ between symbols.
+    Returns (indicators, conditions) arrays of shape (N, len(BATCH_INDICATORS)) and
+    (N, len(BATCH_CONDITIONS)).
+    """
+    n = len(close_1h)
+    w1 = max((len(c) for c in close_1h), default=0)
+    w15 = max((len(c) for c in close_15m), default=0)
+    start_1h = np.array([w1 - len(c) for c in close_1h], dtype=np.int64)
+    start_15m = np.array([w15 - len(c) for c in close_15m], dtype=np.int64)
+    ind = np.empty((n, len(BATCH_INDICATORS)))
+    conds = np.zeros((n, len(BATCH_CONDITIONS)), dtype=np.bool_)
+    _batch_score_nb(_stack(close_1h, w1), start_1h, _stack(close_15m, w15), _stack(high_15m, w15),
+                    _stack(vol_15m, w15), start_15m, ind, conds)
+    return ind, conds
+
+
+def warmup() -> None:
+    """Run every kernel once on tiny inputs so JIT compilation (or loading it from
+    the numba cache) happens at startup rather than during the first scan.
+    """
+    x = np.linspace(1.0, 2.0, 30)
+    _ema(x, 20)
+    _rsi(x, 14)
+    _mfi(x, x, x, x, 14)
+    _macd(x)
+    batch_score([x], [x], [x], [x])
@@ -34,11 +34,12 @@ def detect_bullish_patterns(df: pd.DataFrame) -> dict:
         # Candlestick module unavailable; skip patterns gracefully
         return {name: False for name in BULLISH_PATTERNS}
     res = {name: False for name in BULLISH_PATTERNS}
+    # One shared copy; each pattern function only adds its own result column to it
+    temp = df.copy()
     for name, fn in _PATTERN_FUNCS.items():
         if fn is None:
             continue
         try:
-            temp = df.copy()
             fn(temp)
             # Library convention: adds column with same name set to True on rows where pattern occurs
             if name in temp.columns and bool(temp[name].iloc[-1]):
@@ -1,16 +1,58 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, List, Sequence, Tuple
+import numpy as np
 import pandas as pd
-from .indicators import add_indicators, recent_resistance_break, volume_spike
-from .patterns import detect_bullish_patterns
+from ._njit import NUMBA_AVAILABLE
+from .indicators import add_core_indicators, add_extended_indicators, recent_resistance_break, volume_spike
+from .indicators_fast import BATCH_CONDITIONS, BATCH_INDICATORS, batch_score, passes_gate
+from .patterns import BULLISH_PATTERNS, detect_bullish_patterns
+
+SIGNAL_CONDITIONS = (
+    "rsi_cross_50",
+    "macd_bullish_cross",
+    "price_above_ema20_50",
+    "ema20_gt_ema50",
+    "bullish_pattern",
+    "vol_spike_15m",
+    "rsi_15m_gt_50",
+    "break_resistance_15m",
+    "lunar_trending",
+    "news_positive",
+)
+
+
+def _gated_out(price: float, rsi: float, ema20: float, ema50: float) -> Dict[str, Any]:
+    """Score-0 result for a symbol that failed the gate; same shape as compute_signal's."""
+    return {
+        "score": 0,
+        "conditions": dict.fromkeys(SIGNAL_CONDITIONS, False),
+        "patterns": dict.fromkeys(BULLISH_PATTERNS, False),
+        "indicators": {
+            "rsi": float(rsi),
+            "macd": float("nan"),
+            "macd_signal": float("nan"),
+            "ema20": float(ema20),
+            "ema50": float(ema50),
+            "ema200": float("nan"),
+        },
+        "price": float(price),
+    }
 
 
 def compute_signal(df_1h: pd.DataFrame, df_15m: pd.DataFrame) -> Dict[str, Any]:
     """Compute signal score and components as per spec.
-    Returns dict with score and booleans for each condition.
+    Returns dict with score and booleans for each condition. Symbols failing the
+    cheap price/EMA50/RSI gate get a score-0 result without the remaining work.
     """
-    df1 = add_indicators(df_1h)
-    df15 = add_indicators(df_15m)
+    df1 = add_core_indicators(df_1h)
+    price_now = df1["close"].iloc[-1]
+    ema20 = df1["ema20"].iloc[-1]
+    ema50 = df1["ema50"].iloc[-1]
+    if not passes_gate(price_now, ema50, df1["rsi"].iloc[-1]):
+        return _gated_out(price_now, df1["rsi"].iloc[-1], ema20, ema50)
+    df1 = add_extended_indicators(df1)
+    # Only RSI is read on 15m
+    df15 = add_core_indicators(df_15m)
 
     # Core 1H conditions
     conds: Dict[str, bool] = {
@@ -26,13 +68,10 @@ def compute_signal(df_1h: pd.DataFrame, df_15m: pd.DataFrame) -> Dict[str, Any]:
         rsi_now = df1["rsi"].iloc[-1]
         conds["rsi_cross_50"] = bool(rsi_prev <= 50 and 50 < rsi_now < 80)
 
-        macd_prev = df1["macd"].iloc[-2] - df1["macd_signal"].iloc[-2]
-        macd_now = df1["macd"].iloc[-1] - df1["macd_signal"].iloc[-1]
+        # Histogram for the last two bars only
+        macd_prev, macd_now = df1["macd"].to_numpy()[-2:] - df1["macd_signal"].to_numpy()[-2:]
         conds["macd_bullish_cross"] = bool(macd_prev <= 0 and macd_now > 0)
 
-    price_now = df1["close"].iloc[-1]
-    ema20 = df1["ema20"].iloc[-1]
-    ema50 = df1["ema50"].iloc[-1]
     conds["price_above_ema20_50"] = bool(price_now > ema20 and price_now > ema50)
     conds["ema20_gt_ema50"] = bool(ema20 > ema50)
 
@@ -40,10 +79,13 @@ def compute_signal(df_1h: pd.DataFrame, df_15m: pd.DataFrame) -> Dict[str, Any]:
     conds["bullish_pattern"] = any(patterns.values())
 
     # 15m momentum confirmation
+    high15 = df15["high"].to_numpy()
+    close15 = df15["close"].to_numpy()
+    vol15 = df15["volume"].to_numpy()
     conds.update({
-        "vol_spike_15m": volume_spike(df15, multiple=2.0),
+        "vol_spike_15m": volume_spike(vol15, multiple=2.0),
         "rsi_15m_gt_50": bool(df15["rsi"].iloc[-1] > 50),
-        "break_resistance_15m": recent_resistance_break(df15, lookback=20),
+        "break_resistance_15m": recent_resistance_break(high15, close15, lookback=20),
     })
 
     # Sentiment placeholders (to be integrated later)
@@ -68,3 +110,51 @@ def compute_signal(df_1h: pd.DataFrame, df_15m: pd.DataFrame) -> Dict[str, Any]:
         },
         "price": float(price_now),
     }
+
+
+def compute_signals_batch(pairs: Sequence[Tuple[pd.DataFrame, pd.DataFrame]]) -> List[Dict[str, Any]]:
+    """compute_signal for many (df_1h, df_15m) pairs at once; results keep input order.
+    Indicators and conditions for all symbols come from one parallel numba pass, and
+    only pattern detection runs per symbol, for those that pass the gate. Without
+    numba this is compute_signal per pair. Every frame needs at least 2 bars.
+    """
+    if not NUMBA_AVAILABLE:
+        return [compute_signal(df_1h, df_15m) for df_1h, df_15m in pairs]
+    if not pairs:
+        return []
+    ind, cond = batch_score(
+        [df_1h["close"].to_numpy(dtype=np.float64) for df_1h, _ in pairs],
+        [df_15m["close"].to_numpy(dtype=np.float64) for _, df_15m in pairs],
+        [df_15m["high"].to_numpy(dtype=np.float64) for _, df_15m in pairs],
+        [df_15m["volume"].to_numpy(dtype=np.float64) for _, df_15m in pairs],
+    )
+    results: List[Dict[str, Any]] = []
+    for (df_1h, _), ind_row, cond_row in zip(pairs, ind, cond):
+        values = {k: float(v) for k, v in zip(BATCH_INDICATORS, ind_row)}
+        if not passes_gate(values["price"], values["ema50"], values["rsi"]):
+            results.append(_gated_out(values["price"], values["rsi"], values["ema20"], values["ema50"]))
+            continue
+        flags = {k: bool(v) for k, v in zip(BATCH_CONDITIONS, cond_row)}
+        patterns = detect_bullish_patterns(df_1h)
+        # Same keys and order as compute_signal
+        conds: Dict[str, bool] = {
+            "rsi_cross_50": flags["rsi_cross_50"],
+            "macd_bullish_cross": flags["macd_bullish_cross"],
+            "price_above_ema20_50": flags["price_above_ema20_50"],
+            "ema20_gt_ema50": flags["ema20_gt_ema50"],
+            "bullish_pattern": any(patterns.values()),
+            "vol_spike_15m": flags["vol_spike_15m"],
+            "rsi_15m_gt_50": flags["rsi_15m_gt_50"],
+            "break_resistance_15m": flags["break_resistance_15m"],
+            "lunar_trending": False,
+            "news_positive": False,
+        }
+        price = values.pop("price")
+        results.append({
+            "score": sum(1 for v in conds.values() if v),
+            "conditions": conds,
+            "patterns": patterns,
+            "indicators": values,
+            "price": price,
+        })
+    return results
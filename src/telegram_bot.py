@@ -1,14 +1,44 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 import asyncio
+import threading
 from src.config import settings
 
+# Telegram caps a message at 4096 characters
+MAX_MESSAGE_CHARS = 4096
+ALERT_SEPARATOR = "\n\n────────\n\n"
+SEND_TIMEOUT = 10
 
-async def _async_send(token: str, chat_id: str, message: str, html: bool = False) -> None:
-    from telegram import Bot
-    bot = Bot(token=token)
-    parse_mode = "HTML" if html else None
-    await bot.send_message(chat_id=chat_id, text=message, disable_web_page_preview=True, parse_mode=parse_mode)
+# One Bot (and its HTTP connection pool) lives on a persistent event loop in a
+# daemon thread; sends are submitted to it instead of spinning up a loop per message.
+# The loop is started once; only the Bot is retried if its initialization fails.
+_bot: Any = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def _run(coro: Any, loop: asyncio.AbstractEventLoop) -> Any:
+    """Run coro on loop and wait for it; on timeout it is cancelled, not left running."""
+    fut = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return fut.result(timeout=SEND_TIMEOUT)
+    except BaseException:
+        fut.cancel()
+        raise
+
+
+def _get_bot(token: str) -> Tuple[Any, asyncio.AbstractEventLoop]:
+    global _bot, _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="telegram", daemon=True).start()
+        if _bot is None:
+            from telegram import Bot
+            bot = Bot(token=token)
+            _run(bot.initialize(), _loop)
+            _bot = bot
+        return _bot, _loop
 
 
 def send_alert(message: str, html: bool = False) -> bool:
@@ -22,17 +52,45 @@ def send_alert(message: str, html: bool = False) -> bool:
         print("Telegram not configured: set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env")
         return False
     try:
-        try:
-            asyncio.run(_async_send(token, chat_id, message, html=html))
-        except RuntimeError as e:
-            # If already in an event loop (rare in our CLI), fallback to create a new loop
-            loop = asyncio.new_event_loop()
-            try:
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(_async_send(token, chat_id, message, html=html))
-            finally:
-                loop.close()
+        bot, loop = _get_bot(token)
+        parse_mode = "HTML" if html else None
+        _run(
+            bot.send_message(chat_id=chat_id, text=message, disable_web_page_preview=True, parse_mode=parse_mode),
+            loop,
+        )
         return True
     except Exception as e:
         print(f"Failed to send Telegram message: {e}")
         return False
+
+
+def _chunks_by_chars(messages: Iterable[str], limit: int = MAX_MESSAGE_CHARS,
+                     sep: str = ALERT_SEPARATOR) -> Iterator[List[str]]:
+    """Group consecutive messages so each group, joined with sep, stays within limit.
+    A single message longer than limit gets a group of its own.
+    """
+    chunk: List[str] = []
+    size = 0
+    for m in messages:
+        extra = len(m) + (len(sep) if chunk else 0)
+        if chunk and size + extra > limit:
+            yield chunk
+            chunk, size = [], 0
+            extra = len(m)
+        chunk.append(m)
+        size += extra
+    if chunk:
+        yield chunk
+
+
+def send_alerts(messages: Iterable[str], html: bool = False, limit: int = MAX_MESSAGE_CHARS) -> List[int]:
+    """Send many alerts as few Telegram messages as the length limit allows.
+    Returns the indices of the alerts that were delivered.
+    """
+    sent: List[int] = []
+    start = 0
+    for chunk in _chunks_by_chars(messages, limit):
+        if send_alert(ALERT_SEPARATOR.join(chunk), html=html):
+            sent.extend(range(start, start + len(chunk)))
+        start += len(chunk)
+    return sent
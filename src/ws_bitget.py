@@ -0,0 +1,192 @@
+from __future__ import annotations
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+import pandas as pd
+import websockets
+
+from .data_sources import candles_frame
+
+# Bitget public websocket: one persistent connection streams kline updates for the
+# whole candidate universe, so run_once can score from memory instead of REST.
+
+WS_URL = "wss://ws.bitget.com/spot/v1/stream"
+CHANNELS = {"1h": "candle1H", "15m": "candle15m"}
+INTERVAL_MS = {"1h": 3_600_000, "15m": 900_000}
+MAX_ARGS_PER_MESSAGE = 50
+PING_INTERVAL = 25
+RECONNECT_DELAY = 5
+# Reconnect when nothing (not even a pong) has arrived for this long
+STALE_AFTER = 2 * PING_INTERVAL
+
+
+def ws_inst_id(symbol: str) -> str:
+    """Websocket instIds are plain pairs (ABCUSDT), without the REST _SPBL suffix."""
+    return symbol[:-len("_SPBL")] if symbol.endswith("_SPBL") else symbol
+
+
+class CandleStream:
+    """Keeps the latest `maxlen` candles per (symbol, interval) from the Bitget
+    websocket. The connection runs on its own event loop in a daemon thread and
+    reconnects (re-subscribing everything) when it drops.
+    """
+
+    def __init__(self, maxlen: int = 300):
+        self.maxlen = maxlen
+        self._buffers: Dict[Tuple[str, str], Deque[List[Any]]] = {}
+        self._subscribed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._ws: Any = None
+        self._last_message = 0.0
+        self._thread = threading.Thread(target=self._run, name="bitget-ws", daemon=True)
+
+    def start(self) -> "CandleStream":
+        self._thread.start()
+        return self
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and time.monotonic() - self._last_message <= STALE_AFTER
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        """Subscribe to 1h/15m candles for any symbols not already subscribed. Thread-safe."""
+        with self._lock:
+            new = [s for s in dict.fromkeys(ws_inst_id(s) for s in symbols) if s not in self._subscribed]
+            self._subscribed.update(new)
+        if not new:
+            return
+        asyncio.run_coroutine_threadsafe(self._send_subscribe(new), self._loop)
+
+    def candles(self, symbol: str, interval: str, min_bars: int = 1) -> Optional[pd.DataFrame]:
+        """Candles for symbol/interval as a DataFrame shaped like bitget_candles(),
+        or None while the stream is down, holds fewer than min_bars candles, or its
+        latest candle is more than one interval old (the pair stopped updating).
+        """
+        if not self.connected:
+            return None
+        with self._lock:
+            buf = self._buffers.get((ws_inst_id(symbol), CHANNELS[interval]))
+            rows = list(buf) if buf else []
+        if len(rows) < min_bars or rows[-1][0] < time.time() * 1000 - INTERVAL_MS[interval]:
+            return None
+        # candles_frame expects Bitget's most-recent-first order
+        rows.reverse()
+        return candles_frame(rows, self.maxlen)
+
+    # ---- event loop side ----
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._connect_forever())
+
+    async def _connect_forever(self) -> None:
+        while True:
+            try:
+                async with websockets.connect(WS_URL, ping_interval=None) as ws:
+                    self._ws = ws
+                    self._last_message = time.monotonic()
+                    with self._lock:
+                        inst_ids = list(self._subscribed)
+                    await self._send_subscribe(inst_ids)
+                    pinger = asyncio.ensure_future(self._ping(ws))
+                    try:
+                        async for raw in ws:
+                            self._last_message = time.monotonic()
+                            self._handle(raw)
+                    finally:
+                        pinger.cancel()
+            except Exception as e:
+                print(f"Bitget websocket error: {e}")
+            self._ws = None
+            with self._lock:
+                # Data missed while disconnected would leave gaps; start fresh from the next snapshot
+                self._buffers.clear()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _ping(self, ws: Any) -> None:
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            if time.monotonic() - self._last_message > STALE_AFTER:
+                # No pong to the last ping: likely a half-open connection. Closing it
+                # ends the read loop, which then reconnects.
+                print("Bitget websocket stale; reconnecting")
+                await ws.close()
+                return
+            await ws.send("ping")
+
+    async def _send_subscribe(self, inst_ids: List[str]) -> None:
+        ws = self._ws
+        if ws is None or not inst_ids:
+            # Subscribed on (re)connect instead
+            return
+        args = [{"instType": "sp", "channel": ch, "instId": sym} for sym in inst_ids for ch in CHANNELS.values()]
+        for i in range(0, len(args), MAX_ARGS_PER_MESSAGE):
+            await ws.send(json.dumps({"op": "subscribe", "args": args[i:i + MAX_ARGS_PER_MESSAGE]}))
+
+    def _handle(self, raw: Any) -> None:
+        if raw == "pong":
+            return
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return
+        if msg.get("event") == "error":
+            print(f"Bitget websocket subscribe error: {msg}")
+            return
+        arg = msg.get("arg") or {}
+        rows = msg.get("data")
+        if not rows or not isinstance(arg, dict) or "instId" not in arg or "channel" not in arg:
+            return
+        key = (arg["instId"], arg["channel"])
+        # Rows are [ts(ms), open, high, low, close, volume]; keep them oldest first
+        try:
+            rows = sorted(([int(r[0]), *r[1:6]] for r in rows), key=lambda r: r[0])
+        except (ValueError, TypeError, IndexError):
+            # Malformed push: skip it rather than dropping the connection
+            return
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None or msg.get("action") == "snapshot":
+                self._buffers[key] = deque(rows, maxlen=self.maxlen)
+                return
+            for row in rows:
+                if buf and row[0] == buf[-1][0]:
+                    # Update to the candle still forming
+                    buf[-1] = row
+                elif not buf or row[0] > buf[-1][0]:
+                    buf.append(row)
+
+
+_stream: Optional[CandleStream] = None
+_stream_lock = threading.Lock()
+
+
+def get_stream() -> CandleStream:
+    """Process-wide CandleStream, started on first use."""
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            _stream = CandleStream().start()
+        return _stream
+
+
+def stream_candle_pairs(symbols: Iterable[str], min_bars: int = 60) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Subscribe symbols and return {symbol: (df_1h, df_15m)} for those the stream
+    can already serve with at least min_bars candles on both intervals.
+    """
+    stream = get_stream()
+    symbols = list(symbols)
+    stream.subscribe(symbols)
+    pairs: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+    for sym in symbols:
+        df_1h = stream.candles(sym, "1h", min_bars)
+        df_15m = stream.candles(sym, "15m", min_bars) if df_1h is not None else None
+        if df_1h is not None and df_15m is not None:
+            pairs[sym] = (df_1h, df_15m)
+    return pairs